@@ -1,26 +1,190 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
 import os
-import json
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import List, Optional
+from urllib.parse import urlsplit, urlunsplit
 
 from dotenv import load_dotenv
 import httpx
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, Response
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import (
+    HTMLResponse,
+    ORJSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 
 load_dotenv()
 
-app = FastAPI(title="Grok Ad Demographics API")
+# Shared HTTP client for all outbound requests (Grok calls and proxied
+# fetches). One client keeps a pool of keep-alive connections so repeated hits
+# to the same host reuse an existing TCP+TLS connection instead of paying a
+# fresh handshake every time. Created in the lifespan below.
+http_client: Optional[httpx.AsyncClient] = None
+
+# PIL decoding, blurring, compositing and PNG encoding are all synchronous C
+# calls that can hold the event loop for tens of milliseconds per image, so
+# the overlay pipeline runs on this pool instead of the loop thread.
+overlay_executor = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Cap in-flight Grok calls below the pool size so traffic bursts backpressure
+# here instead of queue-bombing the Grok API
+GROK_MAX_CONCURRENCY = 200
+_grok_semaphore = asyncio.Semaphore(GROK_MAX_CONCURRENCY)
+
+
+class TokenBucket:
+    """Minimal in-process token bucket guarding outbound Grok spend.
+
+    Refills continuously at ``rate`` tokens per second up to ``burst``; a
+    request that finds the bucket empty is shed instead of forwarded.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+# Grok enforces per-key RPM limits; shedding bursts locally with 429 is
+# cheaper than forwarding them just to get 5xx responses back
+_grok_bucket = TokenBucket(rate=10.0, burst=20)
+
+
+def _check_grok_rate_limit():
+    """Reject with 429 + Retry-After when the Grok token bucket is empty."""
+    if not _grok_bucket.try_acquire():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared HTTP client on startup and drain it on shutdown."""
+    global http_client
+    http_client = httpx.AsyncClient(
+        # Everything Grok-bound hits the one host api.x.ai; HTTP/2 multiplexes
+        # those calls over a single TLS socket instead of one connection each
+        http2=True,
+        # /generate-ad-image holds two long-lived Grok sockets per request, so
+        # keep a generous warm pool rather than paying TLS handshakes under load
+        limits=httpx.Limits(
+            max_connections=500,
+            max_keepalive_connections=200,
+            keepalive_expiry=120.0,
+        ),
+        # Split timeouts: generous read for slow Grok generations, tight
+        # connect/pool so a saturated pool or dead host fails fast instead of
+        # hanging callers (per-request timeouts still override read)
+        timeout=httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=5.0),
+        # Grok responses are several KB of JSON text; asking for brotli on top
+        # of the default gzip/deflate cuts bytes on the wire noticeably
+        headers={"Accept-Encoding": "br, gzip, deflate"},
+    )
+    yield
+    await http_client.aclose()
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip compression that leaves the image-serving routes alone.
+
+    PNG/WebP/JPEG bodies are already compressed, so gzipping them burns CPU
+    for no size win; everything else (JSON, HTML) compresses 5-10x.
+    """
+
+    _EXCLUDED_PATHS = ("/proxy-image", "/overlay-text")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self._EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app = FastAPI(
+    title="Grok Ad Demographics API",
+    lifespan=lifespan,
+    # orjson serializes responses several times faster than the stdlib encoder
+    default_response_class=ORJSONResponse,
+)
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=512)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Environment variable for Grok API key
 GROK_API_KEY = os.getenv("GROK_API_KEY")
+# Request headers for Grok calls, built once at import instead of per call.
+# None when the key is missing so callers can fail with a clear error.
+GROK_HEADERS = (
+    {
+        "Authorization": f"Bearer {GROK_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    if GROK_API_KEY
+    else None
+)
 GROK_API_URL = "https://api.x.ai/v1/chat/completions"
 # Grok image generation follows the OpenAI-compatible images/generations endpoint shape
 GROK_IMAGE_API_URL = "https://api.x.ai/v1/images/generations"
 
+# The landing page and editor are static, so read them once at import time
+# instead of hitting the filesystem on every request
+_INDEX_HTML_PATH = Path(__file__).parent / "static" / "index.html"
+_INDEX_HTML = (
+    _INDEX_HTML_PATH.read_text(encoding="utf-8") if _INDEX_HTML_PATH.exists() else None
+)
+_EDITOR_HTML_PATH = Path(__file__).parent / "static" / "editor.html"
+_EDITOR_HTML = (
+    _EDITOR_HTML_PATH.read_text(encoding="utf-8") if _EDITOR_HTML_PATH.exists() else None
+)
+
+
+def _html_etag(html: Optional[str]) -> Optional[str]:
+    """Precompute a content ETag for a cached HTML page."""
+    if html is None:
+        return None
+    return f'"{hashlib.blake2b(html.encode(), digest_size=16).hexdigest()}"'
+
+
+_INDEX_ETAG = _html_etag(_INDEX_HTML)
+_EDITOR_ETAG = _html_etag(_EDITOR_HTML)
+# Short max-age so UI tweaks still roll out promptly; revalidations are a
+# free 304 against the precomputed ETag
+_HTML_CACHE_CONTROL = "public, max-age=300"
+
+
+def _serve_cached_html(html: str, etag: str, request: Request):
+    """Serve a cached page, answering a matching If-None-Match with 304."""
+    headers = {"ETag": etag, "Cache-Control": _HTML_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
+
 
 # Request model
 class AdRequest(BaseModel):
@@ -83,16 +247,29 @@ class BrandStyleResponse(BaseModel):
     product_description: str  # Detailed description of the product/service for image generation
 
 
-async def call_grok_api(product_url: str, custom_prompt: str) -> AdDemographics:
-    """Call Grok API to generate ad demographics."""
-    if not GROK_API_KEY:
-        raise HTTPException(
-            status_code=500,
-            detail="GROK_API_KEY environment variable is not set"
-        )
+class OverlayTextRequest(BaseModel):
+    image_url: str
+    slogan_text: str = ""
+    company_text: str = ""
+    slogan_x: float = 50
+    slogan_y: float = 70
+    company_x: float = 50
+    company_y: float = 85
+    slogan_color: str = "#FFFFFF"
+    company_color: str = "#FFFFFF"
+    slogan_size: int = 32
+    company_size: int = 24
+    slogan_width: Optional[int] = None
+    slogan_height: Optional[int] = None
+    company_width: Optional[int] = None
+    company_height: Optional[int] = None
+    font_style: str = "Modern Sans-Serif"
+    output_format: str = "png"  # "png" or "webp"
+
 
-    
-    system_message = """You are an expert in advertising demographics analysis. 
+# System prompts for the Grok chat calls. These are multi-kilobyte constants,
+# so define them once at module level rather than rebuilding them per call.
+SYSTEM_MESSAGE_DEMOGRAPHICS = """You are an expert in advertising demographics analysis. 
 Given a product URL and additional context, analyze and return the TOP target demographic 
 information in JSON format with the following exact fields:
 - gender: REQUIRED - The target gender (string: "Any", "Woman", or "Man")
@@ -133,133 +310,7 @@ CRITICAL:
 
 Return ONLY valid JSON with these four fields, no additional text or markdown formatting."""
 
-    user_message = f"""Product URL: {product_url}
-
-Custom Prompt: {custom_prompt}
-
-Please analyze this product and provide the ad demographics in JSON format."""
-
-    headers = {
-        "Authorization": f"Bearer {GROK_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "grok-3",
-        "messages": [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ],
-        "temperature": 0.7
-    }
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GROK_API_URL,
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract content from Grok response
-            content = result["choices"][0]["message"]["content"]
-            
-            # Parse JSON from response (handle if wrapped in markdown code blocks)
-            content = content.strip()
-            if content.startswith("```"):
-                # Remove markdown code block markers
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1]) if len(lines) > 2 else content
-            
-            demographics_data = json.loads(content)
-            return AdDemographics(**demographics_data)
-            
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"Grok API error: {e.response.text}"
-        )
-    except (KeyError, json.JSONDecodeError, ValueError) as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to parse Grok API response: {str(e)}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Unexpected error: {str(e)}"
-        )
-
-
-def build_image_prompt(request: AdImageRequest) -> str:
-    """Construct a concise image-generation prompt using product description, brand styles, and demographics."""
-    # Start with product description - this is the core focus
-    if request.product_description:
-        # Truncate product description if too long to leave room for other instructions
-        max_desc_length = 400
-        product_desc = request.product_description[:max_desc_length] if len(request.product_description) > max_desc_length else request.product_description
-        product_focus = f"Professional ad image: {product_desc}"
-    else:
-        product_focus = f"Professional ad image for product at {request.product_url}"
-
-    # Build demographic targeting instructions
-    demo_parts = []
-    if request.gender and request.gender != "Any":
-        demo_parts.append(request.gender.lower())
-    if request.age_range:
-        demo_parts.append(f"aged {request.age_range}")
-    if request.language:
-        demo_parts.append(f"speaking {request.language}")
-    if request.location:
-        demo_parts.append(f"located in {request.location}")
-
-    demo_text = f" Target audience: {', '.join(demo_parts)}." if demo_parts else ""
-
-    # Build brand style instructions (concise)
-    style_parts = []
-    if request.colors:
-        colors_list = ", ".join(request.colors[:3])  # Limit to 3 colors to save space
-        style_parts.append(f"colors: {colors_list}")
-    if request.mood:
-        style_parts.append(f"mood: {request.mood}")
-
-    style_text = f" Brand style: {', '.join(style_parts)}." if style_parts else ""
-
-    # Concise requirements
-    requirements = (
-        "No text in image, background, or reflections. No logos. No people unless depicting target audience is applicable. Product-focused. "
-        "Keep product depiction accurate and close to real product, minimize hallucination.  keep it consistent with this brand's identity, and target the target audience heavily "
-        "Bottom third: simple/uncluttered for text overlay. "
-        "Upper two-thirds: product. "
-        "Suggest optimal text placement coordinates for slogan (top text) and company name (bottom text) as percentages from top-left corner."
-    )
-
-    prompt = f"{requirements}{style_text}{product_focus}{demo_text}"
-
-    # Ensure prompt doesn't exceed 1024 characters
-    if len(prompt) > 1024:
-        # Further truncate product description if needed
-        available_space = 1024 - len(demo_text) - len(style_text) - len(requirements) - 50  # 50 char buffer
-        if request.product_description:
-            truncated_desc = request.product_description[:available_space]
-            product_focus = truncated_desc
-            prompt = f"{product_focus}{demo_text}{style_text}{requirements}"
-
-    return prompt[:1024]  # Hard limit
-
-
-async def call_grok_brand_style_api(product_url: str) -> BrandStyleResponse:
-    """Call Grok API to analyze website and extract brand style elements."""
-    if not GROK_API_KEY:
-        raise HTTPException(
-            status_code=500,
-            detail="GROK_API_KEY environment variable is not set"
-        )
-    
-    system_message = """You are an expert in brand identity and visual design analysis. 
+SYSTEM_MESSAGE_BRAND_STYLE = """You are an expert in brand identity and visual design analysis. 
 Given a business website URL, browse and analyze the website to extract key brand style elements 
 that will be useful for creating advertisements. Return the information in JSON format with the 
 following exact fields:
@@ -315,82 +366,465 @@ CRITICAL:
 - The product_description must be detailed and visually descriptive to enable high-quality image generation.
 - Return ONLY valid JSON with these five fields, no additional text or markdown formatting."""
 
-    user_message = f"""Business Website URL: {product_url}
 
-Please browse this website and analyze its brand identity. Extract the colors, mood, font style, 
-slogan, and a detailed product description that would be useful for creating advertisements. 
-Pay special attention to understanding what product or service is being offered, and provide a 
-comprehensive visual description of it. Return the analysis in JSON format."""
+SYSTEM_MESSAGE_TEXT_PLACEMENT = """You are an expert in advertisement design and typography placement.
+Given an ad image URL and optional product description, analyze the image composition and suggest optimal text placement coordinates for:
+- slogan: The main headline/tagline (should be prominent, usually upper portion)
+- company: The brand/company name (should be secondary, usually lower portion)
 
-    headers = {
-        "Authorization": f"Bearer {GROK_API_KEY}",
-        "Content-Type": "application/json"
+Return coordinates as percentages from the top-left corner (0-100) where the text should be centered.
+Consider visual hierarchy, negative space, and readability. Avoid placing text over busy areas or important product elements.
+
+Return ONLY valid JSON with this exact structure:
+{
+  "slogan": {"x": 50.0, "y": 30.0},
+  "company": {"x": 50.0, "y": 85.0}
+}"""
+
+
+# Constrain the chat completions to emit valid JSON matching our models
+# (x.ai mirrors the OpenAI response_format contract), so replies normally
+# parse on the first attempt without fence heuristics
+_RESPONSE_FORMAT_DEMOGRAPHICS = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "AdDemographics",
+        "schema": AdDemographics.model_json_schema(),
+        "strict": True
+    }
+}
+_RESPONSE_FORMAT_BRAND_STYLE = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "BrandStyleResponse",
+        "schema": BrandStyleResponse.model_json_schema(),
+        "strict": True
     }
-    
+}
+# Text placement has no pydantic model; a plain JSON-object constraint is enough
+_RESPONSE_FORMAT_JSON_OBJECT = {"type": "json_object"}
+
+
+# Grok sometimes wraps its JSON reply in a markdown code fence; a single
+# precompiled regex strips it without splitting the response into lines
+_MARKDOWN_FENCE_RE = re.compile(r"^```[a-zA-Z]*\n(.*)\n```\s*$", re.DOTALL)
+
+
+def strip_markdown_fence(content: str) -> str:
+    """Strip a wrapping markdown code fence from a Grok response, if present."""
+    content = content.strip()
+    if content.startswith("```"):
+        match = _MARKDOWN_FENCE_RE.match(content)
+        if match:
+            return match.group(1)
+        # Fall back to line-based stripping for malformed fences
+        lines = content.split("\n")
+        content = "\n".join(lines[1:-1]) if len(lines) > 2 else content
+    return content
+
+
+def _parse_grok_json(response_content: bytes, model_cls=None):
+    """Extract, fence-strip and parse the JSON body of a Grok chat response.
+
+    Returns a validated ``model_cls`` instance when one is given, otherwise a
+    plain dict. model_validate_json parses and validates in one pass instead
+    of materializing an intermediate dict first. Raises KeyError/ValueError on
+    malformed envelopes, which the callers already handle.
+    """
+    envelope = orjson.loads(response_content)
+    content = envelope["choices"][0]["message"]["content"]
+    # Most replies are bare JSON; parse as-is first and only pay for the
+    # fence-stripping pass when that fails
+    if model_cls is not None:
+        try:
+            return model_cls.model_validate_json(content)
+        except ValueError:
+            return model_cls.model_validate_json(strip_markdown_fence(content))
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return orjson.loads(strip_markdown_fence(content))
+
+
+# Grok calls take seconds and are billed per request, while their outputs are
+# stable for a given input, so memoize successful results in small TTL-bounded
+# LRU caches. Repeat analyses of the same product URL become dict lookups.
+_GROK_CACHE_MAX_ENTRIES = 512
+_GROK_CACHE_TTL = 3600.0
+_demographics_cache: OrderedDict = OrderedDict()
+_brand_style_cache: OrderedDict = OrderedDict()
+_text_placement_cache: OrderedDict = OrderedDict()
+
+# Set AI_CACHE_FORCE_REFRESH=1 to bypass cached Grok responses (fresh results
+# still replace the stored entries on the way out)
+AI_CACHE_FORCE_REFRESH = os.getenv("AI_CACHE_FORCE_REFRESH", "").lower() in ("1", "true", "yes")
+
+
+def _grok_cache_key(model: str, system_message: str, user_message: str) -> str:
+    """Hash the payload pieces that determine a Grok chat response."""
+    digest = hashlib.sha256()
+    for part in (model, system_message, user_message):
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Query parameters that never change what a page sells; stripping them lets
+# tracking-link variants of the same product URL share one cache entry
+_TRACKING_QUERY_PARAMS = frozenset({
+    "ref", "source", "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"
+})
+
+
+def _normalize_product_url(url: str) -> str:
+    """Canonicalize a product URL for cache keying only.
+
+    Near-duplicate submissions of the same page — different casing in the
+    host, a trailing slash, a fragment, or appended tracking parameters —
+    should hit the same cached Grok analysis. The URL sent to Grok itself is
+    left untouched.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if pair and pair.split("=")[0].lower() not in _TRACKING_QUERY_PARAMS
+        and not pair.split("=")[0].lower().startswith("utm_")
+    )
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so trivially reworded prompts cache together."""
+    return " ".join(prompt.split()).casefold()
+
+
+def _cache_get(cache: OrderedDict, key):
+    """Return a cached value if present and not expired, else None."""
+    if AI_CACHE_FORCE_REFRESH:
+        return None
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    value, stored_at = entry
+    if time.monotonic() - stored_at >= _GROK_CACHE_TTL:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key, value):
+    """Store a value, evicting the oldest entries beyond the size cap."""
+    cache[key] = (value, time.monotonic())
+    cache.move_to_end(key)
+    while len(cache) > _GROK_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def require_grok_headers() -> dict:
+    """Return the precomputed Grok request headers, or fail if the key is unset."""
+    if GROK_HEADERS is None:
+        raise HTTPException(
+            status_code=500,
+            detail="GROK_API_KEY environment variable is not set"
+        )
+    return GROK_HEADERS
+
+
+async def _grok_chat_json(
+    model: str,
+    system_message: str,
+    user_message: str,
+    *,
+    temperature: float,
+    response_format: dict,
+    timeout: float,
+    schema=None
+):
+    """POST a chat completion to Grok and return its parsed JSON body.
+
+    Carries the auth check, semaphore, orjson round-trip, and error mapping
+    that the individual callers used to repeat. Returns a validated
+    ``schema`` instance when one is given, otherwise a plain dict.
+    """
+    headers = require_grok_headers()
     payload = {
-        "model": "grok-4-fast",
+        "model": model,
         "messages": [
             {"role": "system", "content": system_message},
             {"role": "user", "content": user_message}
         ],
-        "temperature": 0.7
+        "temperature": temperature,
+        "response_format": response_format
     }
-    
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+        async with _grok_semaphore:
+            response = await http_client.post(
                 GROK_API_URL,
                 headers=headers,
-                json=payload,
-                timeout=60.0  # Longer timeout for website browsing
+                content=orjson.dumps(payload),
+                timeout=timeout
             )
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract content from Grok response
-            content = result["choices"][0]["message"]["content"]
-            
-            # Parse JSON from response (handle if wrapped in markdown code blocks)
-            content = content.strip()
-            if content.startswith("```"):
-                # Remove markdown code block markers
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1]) if len(lines) > 2 else content
-            
-            style_data = json.loads(content)
-            return BrandStyleResponse(**style_data)
-            
+        response.raise_for_status()
+        return _parse_grok_json(response.content, schema)
+
     except httpx.HTTPStatusError as e:
         raise HTTPException(
             status_code=e.response.status_code,
             detail=f"Grok API error: {e.response.text}"
         )
-    except (KeyError, json.JSONDecodeError, ValueError) as e:
+    except (KeyError, orjson.JSONDecodeError, ValueError) as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to parse Grok API response: {str(e)}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Unexpected error: {str(e)}"
+        )
+
+
+async def call_grok_api(product_url: str, custom_prompt: str) -> AdDemographics:
+    """Call Grok API to generate ad demographics."""
+    headers = require_grok_headers()
+
+    user_message = f"""Product URL: {product_url}
+
+Custom Prompt: {custom_prompt}
+
+Please analyze this product and provide the ad demographics in JSON format."""
+
+    cache_key = _grok_cache_key(
+        "grok-3",
+        SYSTEM_MESSAGE_DEMOGRAPHICS,
+        f"{_normalize_product_url(product_url)}\n{_normalize_prompt(custom_prompt)}"
     )
+    cached = _cache_get(_demographics_cache, cache_key)
+    if cached is not None:
+        return cached
 
+    _check_grok_rate_limit()
 
-async def call_grok_image_api(request: AdImageRequest) -> AdImageResponse:
-    """Call Grok image generation API to produce an ad image."""
-    if not GROK_API_KEY:
+    payload = {
+        "model": "grok-3",
+        "messages": [
+            {"role": "system", "content": SYSTEM_MESSAGE_DEMOGRAPHICS},
+            {"role": "user", "content": user_message}
+        ],
+        "temperature": 0.7,
+        "response_format": _RESPONSE_FORMAT_DEMOGRAPHICS,
+        # Stream tokens as they generate so parsing can start the moment the
+        # JSON object closes instead of waiting out the whole completion
+        "stream": True
+    }
+
+    try:
+        demographics = None
+        content_parts: List[str] = []
+        async with _grok_semaphore:
+            async with http_client.stream(
+                "POST",
+                GROK_API_URL,
+                headers=headers,
+                content=orjson.dumps(payload),
+                timeout=30.0
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    chunk = orjson.loads(data)
+                    choices = chunk.get("choices")
+                    if not choices:
+                        continue
+                    delta = choices[0].get("delta", {}).get("content")
+                    if not delta:
+                        continue
+                    content_parts.append(delta)
+                    # Only attempt a parse when the buffer could plausibly be
+                    # a complete object — closing brace or closing fence
+                    buffered = "".join(content_parts).strip()
+                    if buffered.endswith("}") or buffered.endswith("```"):
+                        try:
+                            demographics = AdDemographics.model_validate_json(
+                                strip_markdown_fence(buffered)
+                            )
+                            break
+                        except ValueError:
+                            pass
+
+        if demographics is None:
+            # Stream ended without an early parse; do the full parse once
+            content = strip_markdown_fence("".join(content_parts))
+            demographics = AdDemographics.model_validate_json(content)
+        _cache_put(_demographics_cache, cache_key, demographics)
+        return demographics
+
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=e.response.status_code,
+            detail=f"Grok API error: {e.response.text}"
+        )
+    except (KeyError, orjson.JSONDecodeError, ValueError) as e:
         raise HTTPException(
             status_code=500,
-            detail="GROK_API_KEY environment variable is not set"
+            detail=f"Failed to parse Grok API response: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
         )
 
-    prompt_text = build_image_prompt(request)
 
-    headers = {
-        "Authorization": f"Bearer {GROK_API_KEY}",
-        "Content-Type": "application/json"
-    }
+# Static requirements appended to every image prompt, hoisted so per-call work
+# is just assembling the variable fragments
+_IMAGE_PROMPT_REQUIREMENTS = (
+    "No text in image, background, or reflections. No logos. No people unless depicting target audience is applicable. Product-focused. "
+    "Keep product depiction accurate and close to real product, minimize hallucination.  keep it consistent with this brand's identity, and target the target audience heavily "
+    "Bottom third: simple/uncluttered for text overlay. "
+    "Upper two-thirds: product. "
+    "Suggest optimal text placement coordinates for slogan (top text) and company name (bottom text) as percentages from top-left corner."
+)
+
+
+def build_image_prompt(request: AdImageRequest) -> str:
+    """Construct a concise image-generation prompt using product description, brand styles, and demographics."""
+    # Delegate through a tuple-keyed memo so regenerating an ad with the same
+    # inputs (common while iterating in the editor) reuses the built prompt
+    return _build_image_prompt_cached(
+        request.product_url,
+        request.gender,
+        request.age_range,
+        request.language,
+        request.location,
+        tuple(request.colors) if request.colors else None,
+        request.mood,
+        request.product_description
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_image_prompt_cached(
+    product_url: str,
+    gender: Optional[str],
+    age_range: Optional[str],
+    language: Optional[str],
+    location: Optional[str],
+    colors: Optional[tuple],
+    mood: Optional[str],
+    product_description: Optional[str]
+) -> str:
+    # Build demographic targeting instructions
+    demo_parts = []
+    if gender and gender != "Any":
+        demo_parts.append(gender.lower())
+    if age_range:
+        demo_parts.append(f"aged {age_range}")
+    if language:
+        demo_parts.append(f"speaking {language}")
+    if location:
+        demo_parts.append(f"located in {location}")
+
+    demo_text = f" Target audience: {', '.join(demo_parts)}." if demo_parts else ""
+
+    # Build brand style instructions (concise)
+    style_parts = []
+    if colors:
+        colors_list = ", ".join(colors[:3])  # Limit to 3 colors to save space
+        style_parts.append(f"colors: {colors_list}")
+    if mood:
+        style_parts.append(f"mood: {mood}")
+
+    style_text = f" Brand style: {', '.join(style_parts)}." if style_parts else ""
+
+    # Give the product description whatever room the fixed fragments leave
+    # within the 1024-character limit (capped at 400 as before), so the prompt
+    # is assembled once instead of built, measured, and rebuilt
+    if product_description:
+        budget = 1024 - len(_IMAGE_PROMPT_REQUIREMENTS) - len(style_text) - len(demo_text)
+        max_desc_length = max(0, min(400, budget - len("Professional ad image: ")))
+        product_focus = f"Professional ad image: {product_description[:max_desc_length]}"
+    else:
+        product_focus = f"Professional ad image for product at {product_url}"
+
+    prompt = "".join((_IMAGE_PROMPT_REQUIREMENTS, style_text, product_focus, demo_text))
+    return prompt[:1024]  # Hard limit
+
+
+# Concurrent analyses of the same URL coalesce onto one in-flight Grok call:
+# the first request starts the task, the rest await its result
+_brand_style_inflight: dict = {}
+
+
+async def call_grok_brand_style_api(product_url: str) -> BrandStyleResponse:
+    """Call Grok API to analyze website and extract brand style elements.
+
+    Single-flight per normalized URL — simultaneous requests (multiple tabs,
+    double clicks) share one 60-second Grok call instead of each paying for
+    their own.
+    """
+    key = _normalize_product_url(product_url)
+    inflight = _brand_style_inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+    task = asyncio.create_task(_fetch_brand_style(product_url))
+    _brand_style_inflight[key] = task
+    try:
+        return await task
+    finally:
+        _brand_style_inflight.pop(key, None)
+
+
+async def _fetch_brand_style(product_url: str) -> BrandStyleResponse:
+    """Run the actual brand-style Grok call (cache check included)."""
+    user_message = f"""Business Website URL: {product_url}
+
+Please browse this website and analyze its brand identity. Extract the colors, mood, font style, 
+slogan, and a detailed product description that would be useful for creating advertisements. 
+Pay special attention to understanding what product or service is being offered, and provide a 
+comprehensive visual description of it. Return the analysis in JSON format."""
+
+    cache_key = _grok_cache_key(
+        "grok-4-fast", SYSTEM_MESSAGE_BRAND_STYLE, _normalize_product_url(product_url)
+    )
+    cached = _cache_get(_brand_style_cache, cache_key)
+    if cached is not None:
+        return cached
+
+    _check_grok_rate_limit()
+
+    brand_style = await _grok_chat_json(
+        "grok-4-fast",
+        SYSTEM_MESSAGE_BRAND_STYLE,
+        user_message,
+        temperature=0.7,
+        response_format=_RESPONSE_FORMAT_BRAND_STYLE,
+        timeout=60.0,  # Longer timeout for website browsing
+        schema=BrandStyleResponse
+    )
+    _cache_put(_brand_style_cache, cache_key, brand_style)
+    return brand_style
+
+
+async def call_grok_image_api(request: AdImageRequest) -> AdImageResponse:
+    """Call Grok image generation API to produce an ad image."""
+    headers = require_grok_headers()
+    _check_grok_rate_limit()
+
+    prompt_text = build_image_prompt(request)
 
     payload = {
         "model": "grok-imagine-v0p9",
@@ -399,44 +833,45 @@ async def call_grok_image_api(request: AdImageRequest) -> AdImageResponse:
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+        async with _grok_semaphore:
+            response = await http_client.post(
                 GROK_IMAGE_API_URL,
                 headers=headers,
-                json=payload,
+                content=orjson.dumps(payload),
                 timeout=60.0
             )
-            response.raise_for_status()
-            result = response.json()
-
-            data = result.get("data")
-            if not data or not isinstance(data, list):
-                raise ValueError("Missing image data in Grok response")
-
-            image_entry = data[0]
-            image_url = image_entry.get("url")
-            if not image_url and image_entry.get("b64_json"):
-                image_url = f"data:image/png;base64,{image_entry['b64_json']}"
-
-            if not image_url:
-                raise ValueError("No image URL returned by Grok")
-
-            # Get text placement suggestions
-            text_placement = await get_text_placement(image_url, request.product_description)
-
-            return AdImageResponse(
-                image_url=image_url,
-                prompt_used=prompt_text,
-                metadata={"raw": image_entry},
-                text_placement=text_placement
-            )
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+
+        data = result.get("data")
+        if not data or not isinstance(data, list):
+            raise ValueError("Missing image data in Grok response")
+
+        image_entry = data[0]
+        image_url = image_entry.get("url")
+        if not image_url and image_entry.get("b64_json"):
+            image_url = f"data:image/png;base64,{image_entry['b64_json']}"
+
+        if not image_url:
+            raise ValueError("No image URL returned by Grok")
+
+        # Return the image right away with the bottom-third default placement
+        # the prompt already asks for; refined coordinates are a separate Grok
+        # call the client fetches afterwards via /text-placement, so the image
+        # response is not blocked on a second multi-second round-trip
+        return AdImageResponse(
+            image_url=image_url,
+            prompt_used=prompt_text,
+            metadata={"raw": image_entry},
+            text_placement=DEFAULT_TEXT_PLACEMENT
+        )
 
     except httpx.HTTPStatusError as e:
         raise HTTPException(
             status_code=e.response.status_code,
             detail=f"Grok image API error: {e.response.text}"
         )
-    except (KeyError, json.JSONDecodeError, ValueError) as e:
+    except (KeyError, orjson.JSONDecodeError, ValueError) as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to parse Grok image API response: {str(e)}"
@@ -448,265 +883,504 @@ async def call_grok_image_api(request: AdImageRequest) -> AdImageResponse:
         )
 
 
-async def get_text_placement(image_url: str, product_description: Optional[str] = None) -> dict:
-    """Get suggested text placement coordinates for the ad image."""
-    if not GROK_API_KEY:
-        return {"slogan": {"x": 50, "y": 70}, "company": {"x": 50, "y": 85}}  # Default positions
-
-    system_message = """You are an expert in advertisement design and typography placement.
-Given an ad image URL and optional product description, analyze the image composition and suggest optimal text placement coordinates for:
-- slogan: The main headline/tagline (should be prominent, usually upper portion)
-- company: The brand/company name (should be secondary, usually lower portion)
+# Fallback coordinates matching the "bottom third is kept clear for text"
+# contract in the image prompt; also the editor's initial overlay positions
+DEFAULT_TEXT_PLACEMENT = {"slogan": {"x": 50, "y": 70}, "company": {"x": 50, "y": 85}}
 
-Return coordinates as percentages from the top-left corner (0-100) where the text should be centered.
-Consider visual hierarchy, negative space, and readability. Avoid placing text over busy areas or important product elements.
 
-Return ONLY valid JSON with this exact structure:
-{
-  "slogan": {"x": 50.0, "y": 30.0},
-  "company": {"x": 50.0, "y": 85.0}
-}"""
+async def get_text_placement(image_url: str, product_description: Optional[str] = None) -> dict:
+    """Get suggested text placement coordinates for the ad image."""
+    if GROK_HEADERS is None:
+        return DEFAULT_TEXT_PLACEMENT  # Default positions
 
     user_message = f"""Ad Image URL: {image_url}
 Product Description: {product_description or 'N/A'}
 
 Please analyze this ad image and suggest optimal text placement coordinates for slogan and company name as percentages from top-left corner."""
 
-    headers = {
-        "Authorization": f"Bearer {GROK_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": "grok-3",
-        "messages": [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ],
-        "temperature": 0.3
-    }
+    cache_key = _grok_cache_key("grok-3", SYSTEM_MESSAGE_TEXT_PLACEMENT, user_message)
+    cached = _cache_get(_text_placement_cache, cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GROK_API_URL,
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            content = result["choices"][0]["message"]["content"]
-            content = content.strip()
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1]) if len(lines) > 2 else content
-
-            placement_data = json.loads(content)
-            return placement_data
+        # A shed request falls through to the default placement below rather
+        # than surfacing a 429 for what is only a refinement
+        _check_grok_rate_limit()
+        placement_data = await _grok_chat_json(
+            "grok-3",
+            SYSTEM_MESSAGE_TEXT_PLACEMENT,
+            user_message,
+            temperature=0.3,
+            response_format=_RESPONSE_FORMAT_JSON_OBJECT,
+            timeout=30.0
+        )
+        _cache_put(_text_placement_cache, cache_key, placement_data)
+        return placement_data
 
     except Exception as e:
         # Return default positions on error
-        return {"slogan": {"x": 50, "y": 70}, "company": {"x": 50, "y": 85}}
+        return DEFAULT_TEXT_PLACEMENT
+
+
+# Analysis results are stable for a given input within the server-side cache
+# TTL, so tell clients they may reuse them for the same window
+_ANALYSIS_CACHE_CONTROL = f"public, max-age={int(_GROK_CACHE_TTL)}"
+
 
+def _analysis_etag(*parts: str) -> str:
+    """Deterministic ETag derived from the normalized analysis inputs."""
+    digest = hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
 
-@app.post("/generate-demographics", response_model=AdDemographics)
-async def generate_demographics(request: AdRequest):
+
+@app.post("/generate-demographics")
+async def generate_demographics(request: AdRequest, http_request: Request):
     """Generate ad demographics for a product using Grok API."""
-    return await call_grok_api(request.product_url, request.prompt)
+    etag = _analysis_etag(
+        "demographics",
+        _normalize_product_url(request.product_url),
+        _normalize_prompt(request.prompt)
+    )
+    headers = {"ETag": etag, "Cache-Control": _ANALYSIS_CACHE_CONTROL}
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    demographics = await call_grok_api(request.product_url, request.prompt)
+    # The result is already a validated model; serialize it directly instead of
+    # letting FastAPI re-validate it against a response_model
+    return ORJSONResponse(demographics.model_dump(), headers=headers)
 
 
-@app.post("/generate-ad-image", response_model=AdImageResponse)
+@app.post("/generate-ad-image")
 async def generate_ad_image(request: AdImageRequest):
     """Generate a single ad image tailored to the product and demographics."""
-    return await call_grok_image_api(request)
+    ad_image = await call_grok_image_api(request)
+    return ORJSONResponse(ad_image.model_dump())
 
 
-@app.post("/analyze-brand-style", response_model=BrandStyleResponse)
-async def analyze_brand_style(request: BrandStyleRequest):
-    """Analyze a business website to extract colors, mood, font style, and slogan for ad creation."""
-    return await call_grok_brand_style_api(request.product_url)
-
-
-@app.post("/overlay-text", response_model=dict)
-async def overlay_text(
-    image_url: str,
-    slogan_text: str = "",
-    company_text: str = "",
-    slogan_x: float = 50,
-    slogan_y: float = 70,
-    company_x: float = 50,
-    company_y: float = 85,
-    slogan_color: str = "#FFFFFF",
-    company_color: str = "#FFFFFF",
-    slogan_size: int = 32,
-    company_size: int = 24,
-    slogan_width: Optional[int] = None,
-    slogan_height: Optional[int] = None,
-    company_width: Optional[int] = None,
-    company_height: Optional[int] = None,
-    font_style: str = "Modern Sans-Serif"
-):
-    """Overlay text on image with feathered backdrop."""
-    try:
-        # Fetch the image
-        async with httpx.AsyncClient() as client:
-            response = await client.get(image_url, timeout=30.0, follow_redirects=True)
-            response.raise_for_status()
-            image_data = response.content
-
-        # Process image with PIL
-        from PIL import Image, ImageDraw, ImageFont, ImageFilter
-        import io
-
-        image = Image.open(io.BytesIO(image_data)).convert("RGBA")
-        draw = ImageDraw.Draw(image, "RGBA")
-
-        # Map font style to actual font
-        font_map = {
-            "Modern Sans-Serif": "arial.ttf",
-            "Elegant Serif": "times.ttf",
-            "Bold Geometric": "arialbd.ttf",
-            "Playful Rounded": "arial.ttf",
-            "Minimalist Sans": "arial.ttf",
-            "Classic Serif": "times.ttf",
-            "Tech Monospace": "cour.ttf"
-        }
-        font_name = font_map.get(font_style, "arial.ttf")
+@app.post("/generate-ad-image/redirect")
+async def generate_ad_image_redirect(request: AdImageRequest):
+    """Generate an ad image and send the client straight to its bytes.
 
-        try:
-            slogan_font = ImageFont.truetype(font_name, slogan_size)
-        except:
-            slogan_font = ImageFont.load_default()
+    Skips the JSON envelope: hosted images redirect to Grok's CDN so the
+    bytes never transit this server; base64 replies are decoded once and
+    returned directly.
+    """
+    ad_image = await call_grok_image_api(request)
+    if ad_image.image_url.startswith("data:"):
+        import base64
+        header, _, encoded = ad_image.image_url.partition(",")
+        media_type = header[len("data:"):].split(";")[0] or "image/png"
+        return Response(
+            base64.b64decode(encoded),
+            media_type=media_type,
+            headers={"Cache-Control": "public, max-age=3600"}
+        )
+    # 303 turns the follow-up into a GET; 307 would re-POST the request body
+    # at the CDN
+    return RedirectResponse(
+        ad_image.image_url,
+        status_code=303,
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
 
-        try:
-            company_font = ImageFont.truetype(font_name, company_size)
-        except:
-            company_font = ImageFont.load_default()
-
-        def draw_text_with_backdrop(text, x_percent, y_percent, font, color, width=None, height=None, backdrop_color=(0, 0, 0, 128)):
-            if not text:
-                return
-
-            img_width, img_height = image.size
-            x = int((x_percent / 100) * img_width)
-            y = int((y_percent / 100) * img_height)
-
-            # Get text bbox
-            bbox = draw.textbbox((x, y), text, font=font, anchor="mm")
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            # Use provided dimensions if available, otherwise calculate from text
-            if width is not None and height is not None:
-                backdrop_width = width
-                backdrop_height = height
-            else:
-                backdrop_width = text_width + 40  # padding
-                backdrop_height = text_height + 40  # padding
-
-            # Create backdrop centered on the text position
-            backdrop_x1 = x - backdrop_width // 2
-            backdrop_y1 = y - backdrop_height // 2
-            backdrop_x2 = x + backdrop_width // 2
-            backdrop_y2 = y + backdrop_height // 2
-
-            # Create backdrop image with feathered edges
-            backdrop = Image.new("RGBA", image.size, (0, 0, 0, 0))
-            backdrop_draw = ImageDraw.Draw(backdrop, "RGBA")
-
-            # Draw rounded rectangle with feathered edges
-            backdrop_draw.rounded_rectangle(
-                [backdrop_x1, backdrop_y1, backdrop_x2, backdrop_y2],
-                radius=15,
-                fill=backdrop_color
-            )
 
-            # Apply gaussian blur for feathering
-            backdrop = backdrop.filter(ImageFilter.GaussianBlur(radius=5))
+@app.post("/text-placement")
+async def suggest_text_placement(request: TextPlacementRequest):
+    """Suggest refined text placement coordinates for a generated ad image."""
+    placement = await get_text_placement(request.image_url, request.product_description)
+    return ORJSONResponse(placement)
 
-            # Composite backdrop onto main image
-            image.alpha_composite(backdrop)
 
-            # Draw text
-            draw.text((x, y), text, font=font, fill=color, anchor="mm")
+@app.post("/analyze-brand-style")
+async def analyze_brand_style(request: BrandStyleRequest, http_request: Request):
+    """Analyze a business website to extract colors, mood, font style, and slogan for ad creation."""
+    etag = _analysis_etag("brand-style", _normalize_product_url(request.product_url))
+    headers = {"ETag": etag, "Cache-Control": _ANALYSIS_CACHE_CONTROL}
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    brand_style = await call_grok_brand_style_api(request.product_url)
+    return ORJSONResponse(brand_style.model_dump(), headers=headers)
+
+
+# Editor sessions hammer /overlay-text with slider tweaks against the same
+# source image, so keep recently fetched images in memory
+_OVERLAY_IMAGE_CACHE_MAX_ENTRIES = 32
+_overlay_image_cache: OrderedDict = OrderedDict()
+
+
+async def _fetch_image_bytes(url: str) -> bytes:
+    """Fetch image bytes for the overlay pipeline, caching by URL."""
+    import io
+
+    cached = _cache_get(_overlay_image_cache, url)
+    if cached is not None:
+        return cached
+    # Stream the body in chunks rather than letting httpx materialize it
+    # twice (once in its internal buffer, once in .content) — generated ads
+    # run to several MB
+    buffer = io.BytesIO()
+    async with http_client.stream(
+        "GET", url, timeout=30.0, follow_redirects=True
+    ) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(65536):
+            buffer.write(chunk)
+    image_data = buffer.getvalue()
+    _overlay_image_cache[url] = (image_data, time.monotonic())
+    _overlay_image_cache.move_to_end(url)
+    while len(_overlay_image_cache) > _OVERLAY_IMAGE_CACHE_MAX_ENTRIES:
+        _overlay_image_cache.popitem(last=False)
+    return image_data
+
+
+@functools.lru_cache(maxsize=32)
+def _load_font(font_name: str, size: int):
+    """Load a TrueType font once per (name, size); fall back to the default."""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype(font_name, size)
+    except:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=64)
+def _blurred_backdrop_tile(width, height, corner_radius, blur_radius, color):
+    """Build a feathered rounded-rectangle backdrop tile, one blur per size.
+
+    Blurring a tile just large enough for the backdrop costs O(tile area)
+    rather than O(image area), and ads reuse the same backdrop dimensions
+    constantly, so finished tiles are memoized. Returns ``(tile, margin)``
+    where ``margin`` is the transparent border left for the blur falloff.
+    """
+    from PIL import Image, ImageDraw, ImageFilter
+
+    margin = blur_radius * 3  # room for the gaussian falloff on every side
+    tile = Image.new("RGBA", (width + 2 * margin, height + 2 * margin), (0, 0, 0, 0))
+    tile_draw = ImageDraw.Draw(tile, "RGBA")
+    tile_draw.rounded_rectangle(
+        [margin, margin, margin + width, margin + height],
+        radius=corner_radius,
+        fill=color
+    )
+    return tile.filter(ImageFilter.GaussianBlur(radius=blur_radius)), margin
+
+
+def _render_overlay(
+    image_data: bytes,
+    slogan_text: str,
+    company_text: str,
+    slogan_x: float,
+    slogan_y: float,
+    company_x: float,
+    company_y: float,
+    slogan_color: str,
+    company_color: str,
+    slogan_size: int,
+    company_size: int,
+    slogan_width: Optional[int],
+    slogan_height: Optional[int],
+    company_width: Optional[int],
+    company_height: Optional[int],
+    font_style: str,
+    output_format: str = "png",
+) -> bytes:
+    """Render the text overlay onto the image and return PNG bytes.
+
+    Purely synchronous PIL work; runs on ``overlay_executor``, never on the
+    event loop thread.
+    """
+    # Process image with PIL
+    from PIL import Image, ImageDraw
+    import io
+
+    image = Image.open(io.BytesIO(image_data)).convert("RGBA")
+    draw = ImageDraw.Draw(image, "RGBA")
+
+    # Map font style to actual font
+    font_map = {
+        "Modern Sans-Serif": "arial.ttf",
+        "Elegant Serif": "times.ttf",
+        "Bold Geometric": "arialbd.ttf",
+        "Playful Rounded": "arial.ttf",
+        "Minimalist Sans": "arial.ttf",
+        "Classic Serif": "times.ttf",
+        "Tech Monospace": "cour.ttf"
+    }
+    font_name = font_map.get(font_style, "arial.ttf")
+
+    slogan_font = _load_font(font_name, slogan_size)
+    company_font = _load_font(font_name, company_size)
+
+    def draw_text_with_backdrop(text, x_percent, y_percent, font, color, width=None, height=None, backdrop_color=(0, 0, 0, 128)):
+        if not text:
+            return
+
+        img_width, img_height = image.size
+        x = int((x_percent / 100) * img_width)
+        y = int((y_percent / 100) * img_height)
+
+        # Get text bbox
+        bbox = draw.textbbox((x, y), text, font=font, anchor="mm")
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+
+        # Use provided dimensions if available, otherwise calculate from text
+        if width is not None and height is not None:
+            backdrop_width = width
+            backdrop_height = height
+        else:
+            backdrop_width = text_width + 40  # padding
+            backdrop_height = text_height + 40  # padding
+
+        # Create backdrop centered on the text position
+        backdrop_x1 = x - backdrop_width // 2
+        backdrop_y1 = y - backdrop_height // 2
+
+        # Blur only a tile the size of the backdrop instead of a full-size
+        # canvas; identical tiles come straight from the cache
+        tile, margin = _blurred_backdrop_tile(
+            backdrop_width, backdrop_height, 15, 5, backdrop_color
+        )
 
-        # Draw slogan
-        draw_text_with_backdrop(slogan_text, slogan_x, slogan_y, slogan_font, slogan_color, slogan_width, slogan_height)
+        # Composite backdrop onto main image, clipping tiles that spill past
+        # the top/left edge (alpha_composite rejects negative destinations)
+        dest_x = backdrop_x1 - margin
+        dest_y = backdrop_y1 - margin
+        crop_x = max(0, -dest_x)
+        crop_y = max(0, -dest_y)
+        if crop_x or crop_y:
+            tile = tile.crop((crop_x, crop_y, tile.width, tile.height))
+        image.alpha_composite(tile, (max(0, dest_x), max(0, dest_y)))
+
+        # Draw text
+        draw.text((x, y), text, font=font, fill=color, anchor="mm")
+
+    # Draw slogan
+    draw_text_with_backdrop(slogan_text, slogan_x, slogan_y, slogan_font, slogan_color, slogan_width, slogan_height)
+
+    # Draw company
+    draw_text_with_backdrop(company_text, company_x, company_y, company_font, company_color, company_width, company_height)
+
+    # Convert back to bytes
+    output = io.BytesIO()
+    if output_format == "webp":
+        # WebP encodes much faster than PNG and the files are smaller;
+        # good for editor previews where lossless output isn't needed
+        image.save(output, format="WEBP", quality=90, method=4)
+    else:
+        # compress_level=1 trades slightly larger files for roughly 5x less
+        # zlib time — the editor round-trips this image on every adjustment
+        image.save(output, format="PNG", compress_level=1, optimize=False)
 
-        # Draw company
-        draw_text_with_backdrop(company_text, company_x, company_y, company_font, company_color, company_width, company_height)
+    return output.getvalue()
 
-        # Convert back to bytes
-        output = io.BytesIO()
-        image.save(output, format="PNG")
-        output.seek(0)
 
-        # Return as base64
-        import base64
-        encoded = base64.b64encode(output.getvalue()).decode()
+@app.post("/overlay-text")
+async def overlay_text(request: OverlayTextRequest):
+    """Overlay text on image with feathered backdrop."""
+    try:
+        # Fetch the image (served from cache on repeat editor adjustments)
+        image_data = await _fetch_image_bytes(request.image_url)
+
+        # Hand the PIL pipeline to the thread pool so the event loop stays
+        # free to serve other requests while the image renders
+        png_bytes = await asyncio.get_running_loop().run_in_executor(
+            overlay_executor,
+            _render_overlay,
+            image_data,
+            request.slogan_text,
+            request.company_text,
+            request.slogan_x,
+            request.slogan_y,
+            request.company_x,
+            request.company_y,
+            request.slogan_color,
+            request.company_color,
+            request.slogan_size,
+            request.company_size,
+            request.slogan_width,
+            request.slogan_height,
+            request.company_width,
+            request.company_height,
+            request.font_style,
+            request.output_format,
+        )
 
-        return {"image_base64": f"data:image/png;base64,{encoded}"}
+        # Return the raw encoded image; a base64 JSON envelope would add a
+        # third to the payload and another decode round-trip in the browser
+        media_type = "image/webp" if request.output_format == "webp" else "image/png"
+        return Response(
+            content=png_bytes,
+            media_type=media_type,
+            headers={"Cache-Control": "public, max-age=3600"}
+        )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to overlay text: {str(e)}")
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the single-page UI."""
-    index_path = Path(__file__).parent / "static" / "index.html"
-    if not index_path.exists():
+    if _INDEX_HTML is None:
         return HTMLResponse(
             content="UI not found. Ensure static/index.html exists.",
             status_code=404
         )
-    return HTMLResponse(index_path.read_text(encoding="utf-8"))
+    return _serve_cached_html(_INDEX_HTML, _INDEX_ETAG, request)
 
 
 @app.get("/editor")
-async def editor():
+async def editor(request: Request):
     """Serve the ad editor UI."""
-    editor_path = Path(__file__).parent / "static" / "editor.html"
-    if not editor_path.exists():
+    if _EDITOR_HTML is None:
         return HTMLResponse(
             content="Editor not found. Ensure static/editor.html exists.",
             status_code=404
         )
-    return HTMLResponse(editor_path.read_text(encoding="utf-8"))
+    return _serve_cached_html(_EDITOR_HTML, _EDITOR_ETAG, request)
+
+
+# In-process cache for proxied images. The editor re-fetches the same generated
+# ad image repeatedly while the user tweaks text, so keep recent, reasonably
+# sized images in memory and revalidate with If-None-Match once they expire.
+_PROXY_CACHE_MAX_ENTRIES = 64
+_PROXY_CACHE_MAX_BYTES = 5 * 1024 * 1024
+_PROXY_CACHE_TTL = 3600.0
+_proxy_cache: OrderedDict = OrderedDict()
+
+_PROXY_RESPONSE_HEADERS = {
+    "Cache-Control": "public, max-age=3600",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# Hop-by-hop headers that must never be forwarded from an upstream response.
+# Kept lowercase at module scope so filtering is one set lookup per header
+# (httpx already normalizes header names to lowercase). Content-Type is also
+# excluded because it is passed separately as the response media type.
+_EXCLUDED_UPSTREAM_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "content-type"
+})
+
+
+def _cached_proxy_response(content, content_type, etag, client_if_none_match):
+    """Serve a cached proxy entry, answering a matching revalidation with 304."""
+    headers = dict(_PROXY_RESPONSE_HEADERS)
+    if etag:
+        headers["ETag"] = etag
+        if client_if_none_match == etag:
+            return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=content_type, headers=headers)
 
 
 @app.get("/proxy-image")
-async def proxy_image(image_url: str):
+async def proxy_image(image_url: str, request: Request):
     """Proxy image requests to bypass CORS issues."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                image_url,
-                timeout=30.0,
-                follow_redirects=True
-            )
-            response.raise_for_status()
-            
-            # Determine content type
-            content_type = response.headers.get("content-type", "image/jpeg")
-            
-            return Response(
-                content=response.content,
-                media_type=content_type,
-                headers={
-                    "Cache-Control": "public, max-age=3600",
-                    "Access-Control-Allow-Origin": "*"
-                }
+    client_if_none_match = request.headers.get("if-none-match")
+
+    cached = _proxy_cache.get(image_url)
+    conditional_headers = {}
+    if cached is not None:
+        content, content_type, etag, fetched_at = cached
+        if time.monotonic() - fetched_at < _PROXY_CACHE_TTL:
+            _proxy_cache.move_to_end(image_url)
+            return _cached_proxy_response(
+                content, content_type, etag, client_if_none_match
             )
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"Failed to fetch image: {e.response.text}"
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+    else:
+        # Nothing cached locally, so pass the browser's own revalidation
+        # headers through and let the origin answer it with a 304
+        if client_if_none_match:
+            conditional_headers["If-None-Match"] = client_if_none_match
+        if request.headers.get("if-modified-since"):
+            conditional_headers["If-Modified-Since"] = request.headers["if-modified-since"]
+
+    try:
+        upstream_request = http_client.build_request(
+            "GET", image_url, headers=conditional_headers, timeout=30.0
+        )
+        response = await http_client.send(
+            upstream_request,
+            stream=True,
+            follow_redirects=True
         )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error proxying image: {str(e)}"
         )
+
+    if response.status_code == 304:
+        await response.aclose()
+        if cached is not None:
+            # Upstream confirmed our copy is still fresh; reset the TTL and
+            # serve it (or 304 the client too if its copy matches)
+            content, content_type, etag, _ = cached
+            _proxy_cache[image_url] = (content, content_type, etag, time.monotonic())
+            _proxy_cache.move_to_end(image_url)
+            return _cached_proxy_response(
+                content, content_type, etag, client_if_none_match
+            )
+        # The origin answered the browser's own conditional request
+        headers = dict(_PROXY_RESPONSE_HEADERS)
+        if response.headers.get("etag"):
+            headers["ETag"] = response.headers["etag"]
+        return Response(status_code=304, headers=headers)
+
+    if response.status_code >= 400:
+        # Read the (small) error body so we can surface it, then release the connection
+        await response.aread()
+        await response.aclose()
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Failed to fetch image: {response.text}"
+        )
+
+    # Determine content type
+    content_type = response.headers.get("content-type", "image/jpeg")
+
+    # Cache reasonably sized images so repeat hits skip the upstream fetch and
+    # the re-download entirely; anything larger (or of unknown size) streams
+    # straight through without being stored
+    declared_length = response.headers.get("content-length")
+    if declared_length is not None and int(declared_length) <= _PROXY_CACHE_MAX_BYTES:
+        content = await response.aread()
+        await response.aclose()
+        upstream_etag = response.headers.get("etag")
+        _proxy_cache[image_url] = (
+            content,
+            content_type,
+            upstream_etag,
+            time.monotonic()
+        )
+        _proxy_cache.move_to_end(image_url)
+        while len(_proxy_cache) > _PROXY_CACHE_MAX_ENTRIES:
+            _proxy_cache.popitem(last=False)
+        return _cached_proxy_response(
+            content, content_type, upstream_etag, client_if_none_match
+        )
+
+    # Forward the upstream headers minus the hop-by-hop set. Since the raw
+    # bytes pass through undecoded, this keeps Content-Encoding and
+    # Content-Length intact so the client can decompress and show progress.
+    passthrough_headers = {
+        name: value for name, value in response.headers.items()
+        if name not in _EXCLUDED_UPSTREAM_HEADERS
+    }
+    passthrough_headers.update(_PROXY_RESPONSE_HEADERS)
+
+    # Stream the body through instead of buffering it, so large images never
+    # sit fully in memory and the client sees the first bytes immediately.
+    # aiter_raw skips httpx's content-decoding layer entirely, and the 64 KiB
+    # chunk size keeps the number of reads low for large payloads.
+    return StreamingResponse(
+        response.aiter_raw(chunk_size=65536),
+        media_type=content_type,
+        headers=passthrough_headers,
+        background=BackgroundTask(response.aclose)
+    )